@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Admin / analytics CLI for the Quick Poll database
+Run: python admin_cli.py [--json] <command> [options]
+
+Commands:
+  polls               List polls, newest first (paged)
+  votes               List votes, newest first (paged)
+  users               List users (paged, no password hashes)
+  results <poll>      Results for one poll (link, URL or numeric id);
+                      first choices for ranked-choice polls
+  top                 Top-N polls by vote count (ranked ballots included)
+  rate                Votes per hour
+  stats               Database size, row counts and index statistics
+
+Every command runs a single aggregate query or a sequence of keyset-paged
+queries, so memory use does not grow with the size of the database.
+With --json, listings are written as one JSON object per line and every
+other command prints a single JSON document.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from db import connect_readonly
+
+DB_PATH = os.getenv('SQLITE_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quick_poll_db.sqlite'))
+
+DEFAULT_PAGE_SIZE = 500
+
+# Keyset-paged listings: (columns, table, key column)
+LISTINGS = {
+    'polls': ("poll_id, poll_link, created_at, question", "polls", "poll_id"),
+    'votes': ("vote_id, poll_id, option_id, voter_id, voted_at", "votes", "vote_id"),
+    'users': ("user_id, username, email", "users", "user_id"),
+}
+
+
+def iter_pages(conn, command, page_size, after=None, poll_id=None):
+    """Yield rows newest-first, fetching page_size rows per query"""
+    columns, table, key = LISTINGS[command]
+    cursor_value = after
+    while True:
+        where = []
+        params = []
+        if cursor_value is not None:
+            where.append(f"{key} < ?")
+            params.append(cursor_value)
+        if poll_id is not None:
+            where.append("poll_id = ?")
+            params.append(poll_id)
+        sql = f"SELECT {columns} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {key} DESC LIMIT ?"
+        params.append(page_size)
+
+        rows = conn.execute(sql, params).fetchall()
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        cursor_value = rows[-1][key]
+
+
+def resolve_poll_id(conn, poll):
+    """Accept a poll link, a poll URL or a numeric poll id"""
+    if "/poll/" in poll:
+        poll = poll.split("/poll/")[-1].split("/")[0]
+    row = conn.execute("SELECT poll_id FROM polls WHERE poll_link = ?", (poll,)).fetchone()
+    if row:
+        return row[0]
+    if poll.isdigit():
+        row = conn.execute("SELECT poll_id FROM polls WHERE poll_id = ?", (int(poll),)).fetchone()
+        if row:
+            return row[0]
+    return None
+
+
+def emit_rows(rows, as_json, widths):
+    """Print rows as they arrive, either as JSON lines or a fixed-width table"""
+    count = 0
+    for row in rows:
+        if as_json:
+            print(json.dumps(dict(row)))
+        else:
+            if count == 0:
+                print(" ".join(f"{name:<{width}}" for name, width in zip(row.keys(), widths)))
+                print("-" * (sum(widths) + len(widths) - 1))
+            cells = []
+            for value, width in zip(row, widths):
+                text = "" if value is None else str(value)
+                if len(text) > width:
+                    text = text[:width - 3] + "..."
+                cells.append(f"{text:<{width}}")
+            print(" ".join(cells))
+        count += 1
+    if not as_json:
+        print(f"\n{count} row(s)")
+
+
+def cmd_list(conn, args):
+    poll_id = None
+    if getattr(args, 'poll', None):
+        poll_id = resolve_poll_id(conn, args.poll)
+        if poll_id is None:
+            print(f"Poll '{args.poll}' not found", file=sys.stderr)
+            return 1
+
+    rows = iter_pages(conn, args.command, args.page_size, args.after, poll_id)
+    if args.limit:
+        rows = (row for i, row in zip(range(args.limit), rows))
+
+    widths = {
+        'polls': (8, 16, 20, 50),
+        'votes': (10, 8, 10, 10, 20),
+        'users': (8, 30, 40),
+    }[args.command]
+    emit_rows(rows, args.json, widths)
+    return 0
+
+
+def cmd_results(conn, args):
+    poll_id = resolve_poll_id(conn, args.poll)
+    if poll_id is None:
+        print(f"Poll '{args.poll}' not found", file=sys.stderr)
+        return 1
+
+    question, poll_type, poll_link = conn.execute(
+        "SELECT question, poll_type, poll_link FROM polls WHERE poll_id = ?", (poll_id,)
+    ).fetchone()
+    if poll_type == 'ranked':
+        return print_first_choices(conn, args, poll_id, question, poll_link)
+
+    rows = conn.execute('''
+        SELECT o.option_id, o.option_text, COUNT(v.vote_id) AS vote_count
+        FROM options o
+        LEFT JOIN votes v ON o.option_id = v.option_id
+        WHERE o.poll_id = ?
+        GROUP BY o.option_id, o.option_text
+        ORDER BY o.option_id
+    ''', (poll_id,)).fetchall()
+    total_votes = sum(row['vote_count'] for row in rows)
+
+    options = []
+    for row in rows:
+        option = dict(row)
+        option['percentage'] = round((row['vote_count'] / total_votes * 100) if total_votes > 0 else 0, 2)
+        options.append(option)
+
+    if args.json:
+        print(json.dumps({'poll_id': poll_id, 'question': question,
+                          'total_votes': total_votes, 'options': options}))
+        return 0
+
+    print(f"Question: {question}\n")
+    for option in options:
+        bar = "=" * int(option['percentage'] / 2)  # Scale to 50 chars
+        print(f"{option['option_text']:<30} {option['vote_count']:>8} votes "
+              f"({option['percentage']:>5.1f}%) [{bar}]")
+    print(f"\nTotal Votes: {total_votes}")
+    return 0
+
+
+def print_first_choices(conn, args, poll_id, question, poll_link):
+    """Results for a ranked-choice poll: ballots per first choice"""
+    options = [dict(row) for row in conn.execute(
+        "SELECT option_id, option_text FROM options WHERE poll_id = ? ORDER BY option_id", (poll_id,)
+    )]
+    # Byte 0 of a ballot is the index of its first choice (see ranked.pack_ranking)
+    first_choices = dict(conn.execute('''
+        SELECT substr(ranking, 1, 1), COUNT(*)
+        FROM ranked_ballots
+        WHERE poll_id = ?
+        GROUP BY 1
+    ''', (poll_id,)).fetchall())
+    total_ballots = sum(first_choices.values())
+    for index, option in enumerate(options):
+        option['first_choices'] = first_choices.get(bytes([index]), 0)
+        option['percentage'] = round(
+            (option['first_choices'] / total_ballots * 100) if total_ballots > 0 else 0, 2)
+
+    if args.json:
+        print(json.dumps({'poll_id': poll_id, 'question': question, 'poll_type': 'ranked',
+                          'total_ballots': total_ballots, 'options': options}))
+        return 0
+
+    print(f"Question: {question} (ranked choice, first choices shown)\n")
+    for option in options:
+        bar = "=" * int(option['percentage'] / 2)  # Scale to 50 chars
+        print(f"{option['option_text']:<30} {option['first_choices']:>8} ballots "
+              f"({option['percentage']:>5.1f}%) [{bar}]")
+    print(f"\nTotal Ballots: {total_ballots}")
+    print(f"Instant-runoff rounds: GET /api/polls/{poll_link}/ranked-results")
+    return 0
+
+
+def cmd_top(conn, args):
+    # Each table is aggregated on its own so ranked_ballots can use its poll_id index
+    rows = conn.execute('''
+        SELECT p.poll_id, p.poll_link, t.vote_count, p.question
+        FROM (
+            SELECT poll_id, SUM(n) AS vote_count
+            FROM (
+                SELECT poll_id, COUNT(*) AS n FROM votes GROUP BY poll_id
+                UNION ALL
+                SELECT poll_id, COUNT(*) AS n FROM ranked_ballots GROUP BY poll_id
+            )
+            GROUP BY poll_id
+            ORDER BY vote_count DESC
+            LIMIT ?
+        ) t
+        JOIN polls p ON p.poll_id = t.poll_id
+        ORDER BY t.vote_count DESC
+    ''', (args.n,))
+    if args.json:
+        print(json.dumps([dict(row) for row in rows]))
+        return 0
+    emit_rows(rows, False, (8, 16, 10, 50))
+    return 0
+
+
+def cmd_rate(conn, args):
+    rows = conn.execute('''
+        SELECT strftime('%Y-%m-%d %H:00', voted_at) AS hour, COUNT(*) AS votes
+        FROM votes
+        WHERE voted_at >= datetime('now', ?)
+        GROUP BY hour
+        ORDER BY hour
+    ''', (f"-{args.hours} hours",))
+    if args.json:
+        print(json.dumps([dict(row) for row in rows]))
+        return 0
+    emit_rows(rows, False, (17, 10))
+    return 0
+
+
+def cmd_stats(conn, args):
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    # Bytes used by every table and index; dbstat is optional in SQLite builds
+    try:
+        sizes = dict(conn.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"
+        ).fetchall())
+    except sqlite3.OperationalError:
+        sizes = {}
+
+    tables = []
+    table_names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+    for name in table_names:
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+        indexes = []
+        for index in conn.execute(f'PRAGMA index_list("{name}")').fetchall():
+            columns = [col[2] for col in conn.execute(f'PRAGMA index_info("{index[1]}")')]
+            indexes.append({
+                'name': index[1],
+                'unique': bool(index[2]),
+                'columns': columns,
+                'bytes': sizes.get(index[1]),
+            })
+        tables.append({'table': name, 'rows': rows, 'bytes': sizes.get(name), 'indexes': indexes})
+
+    stats = {
+        'path': DB_PATH,
+        'file_bytes': os.path.getsize(DB_PATH),
+        'page_size': page_size,
+        'page_count': page_count,
+        'free_pages': freelist,
+        'tables': tables,
+    }
+
+    if args.json:
+        print(json.dumps(stats))
+        return 0
+
+    print(f"Database: {stats['path']}")
+    print(f"File size: {stats['file_bytes']} bytes "
+          f"({page_count} pages x {page_size} bytes, {freelist} free)\n")
+    print(f"{'Table':<20} {'Rows':>12} {'Bytes':>12}")
+    print("-" * 46)
+    for table in tables:
+        size = table['bytes'] if table['bytes'] is not None else '-'
+        print(f"{table['table']:<20} {table['rows']:>12} {size:>12}")
+        for index in table['indexes']:
+            size = index['bytes'] if index['bytes'] is not None else '-'
+            unique = ' unique' if index['unique'] else ''
+            print(f"  {index['name']} ({', '.join(index['columns'])}){unique}  {size} bytes")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Quick Poll database admin / analytics')
+    parser.add_argument('--json', action='store_true', help='Machine-readable output')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name in LISTINGS:
+        sub = subparsers.add_parser(name, help=f'List {name}, newest first')
+        sub.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Rows fetched per query')
+        sub.add_argument('--after', type=int, help='Start below this id (resume a listing)')
+        sub.add_argument('--limit', type=int, help='Stop after this many rows')
+        if name == 'votes':
+            sub.add_argument('--poll', help='Only votes for this poll (link or id)')
+        sub.set_defaults(func=cmd_list)
+
+    sub = subparsers.add_parser('results', help='Results for one poll')
+    sub.add_argument('poll', help='Poll link, poll URL or poll id')
+    sub.set_defaults(func=cmd_results)
+
+    sub = subparsers.add_parser('top', help='Top polls by vote count')
+    sub.add_argument('-n', type=int, default=10, help='Number of polls')
+    sub.set_defaults(func=cmd_top)
+
+    sub = subparsers.add_parser('rate', help='Votes per hour')
+    sub.add_argument('--hours', type=int, default=24, help='How far back to look')
+    sub.set_defaults(func=cmd_rate)
+
+    sub = subparsers.add_parser('stats', help='Database size and index statistics')
+    sub.set_defaults(func=cmd_stats)
+
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f"Database not found at: {DB_PATH}", file=sys.stderr)
+        print("Make sure the backend has been run at least once to create the database.", file=sys.stderr)
+        return 1
+
+    try:
+        conn = connect_readonly(DB_PATH)
+        try:
+            return args.func(conn, args)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Database error: {str(e)}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Output piped into head/less that exited early
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,20 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import sqlite3
 import secrets
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from functools import wraps
 import os
 
+import backup
+import ranked
+import search
+import tokens
+import trending
+from db import ReaderPool, Writer, connect_readwrite
+from rate_limit import AdmissionController, Rejected
+
 app = Flask(__name__)
 CORS(app)
 
@@ -19,13 +30,73 @@ except ImportError:
     print("Warning: bcrypt not available. User authentication features will be disabled.")
 
 # Database configuration - using SQLite
-DB_PATH = os.path.join(os.path.dirname(__file__), 'quick_poll_db.sqlite')
+DB_PATH = os.getenv('SQLITE_DB_PATH', os.path.join(os.path.dirname(__file__), 'quick_poll_db.sqlite'))
+
+# Number of read-only connections shared by the read endpoints
+READER_POOL_SIZE = int(os.getenv('DB_READERS', 4))
+
+# Search pagination
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+
+# Trending polls - vote scores halve every TRENDING_HALF_LIFE seconds
+TRENDING_HALF_LIFE = float(os.getenv('TRENDING_HALF_LIFE', 3600))
+TRENDING_DEFAULT_LIMIT = 10
+TRENDING_MAX_LIMIT = 50
+
+# Poll types: one choice per voter, or a ranked-choice ballot
+POLL_TYPES = ('single', 'ranked')
+
+# Ranked-choice results kept in memory; an entry is reused until the poll
+# receives a new ballot
+RANKED_RESULTS_CACHE_SIZE = int(os.getenv('RANKED_RESULTS_CACHE', 128))
+
+# Session tokens - without SECRET_KEY a random key is used and every
+# token becomes invalid when the server restarts
+SECRET_KEY = os.getenv('SECRET_KEY')
+if not SECRET_KEY:
+    SECRET_KEY = secrets.token_hex(32)
+    print("Warning: SECRET_KEY not set. Session tokens will not survive a restart.")
+TOKEN_TTL = int(os.getenv('TOKEN_TTL', 24 * 3600))
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# Admission control - per-client token buckets plus a concurrency limit per
+# route class. Requests that would wait longer than the latency target are shed.
+ADMISSION = {
+    'vote': AdmissionController(
+        'vote',
+        rate=float(os.getenv('VOTE_RATE', 5)),
+        burst=float(os.getenv('VOTE_BURST', 10)),
+        max_concurrent=int(os.getenv('VOTE_CONCURRENCY', 16)),
+        max_waiting=int(os.getenv('VOTE_QUEUE', 64)),
+        latency_target=float(os.getenv('VOTE_LATENCY_TARGET', 0.5))
+    ),
+    # bcrypt is CPU-bound, so auth gets a much tighter budget
+    'auth': AdmissionController(
+        'auth',
+        rate=float(os.getenv('AUTH_RATE', 0.2)),
+        burst=float(os.getenv('AUTH_BURST', 5)),
+        max_concurrent=int(os.getenv('AUTH_CONCURRENCY', 4)),
+        max_waiting=int(os.getenv('AUTH_QUEUE', 16)),
+        latency_target=float(os.getenv('AUTH_LATENCY_TARGET', 1.0))
+    ),
+    # A ranked-choice recount reads every ballot of the poll, so only a few
+    # may run at once
+    'tally': AdmissionController(
+        'tally',
+        rate=float(os.getenv('TALLY_RATE', 2)),
+        burst=float(os.getenv('TALLY_BURST', 10)),
+        max_concurrent=int(os.getenv('TALLY_CONCURRENCY', 2)),
+        max_waiting=int(os.getenv('TALLY_QUEUE', 16)),
+        latency_target=float(os.getenv('TALLY_LATENCY_TARGET', 2.0))
+    ),
+}
 
 def get_db_connection():
-    """Create and return database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # Enable dictionary-like access
-    return conn
+    """Create and return a read-write database connection"""
+    return connect_readwrite(DB_PATH)
 
 def init_database():
     """Initialize database and create tables if they don't exist"""
@@ -50,10 +121,16 @@ def init_database():
             question VARCHAR(255) NOT NULL,
             poll_link VARCHAR(20) NOT NULL UNIQUE,
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            poll_type VARCHAR(10) NOT NULL DEFAULT 'single',
             FOREIGN KEY (creator_id) REFERENCES users(user_id) ON DELETE CASCADE
         )
     """)
     
+    # Add poll_type to databases created before ranked-choice polls
+    cursor.execute("PRAGMA table_info(polls)")
+    if 'poll_type' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE polls ADD COLUMN poll_type VARCHAR(10) NOT NULL DEFAULT 'single'")
+    
     # Create options table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS options (
@@ -79,6 +156,37 @@ def init_database():
         )
     """)
     
+    # Vote counts per option are read on every poll and results request
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_option ON votes(option_id)")
+    # Recent-vote range scans: the trending rebuild at startup and admin_cli.py rate
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_voted_at ON votes(voted_at, poll_id)")
+    # Per-poll vote listings paged by vote_id (admin_cli.py votes --poll); the
+    # rowid is the implicit last column, so this covers (poll_id, vote_id)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_poll ON votes(poll_id)")
+    
+    # Create ranked ballots table - ranking is packed one byte per option
+    # (see ranked.pack_ranking)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ranked_ballots (
+            ballot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            poll_id INTEGER NOT NULL,
+            voter_id INTEGER,
+            ranking BLOB NOT NULL,
+            cast_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (poll_id) REFERENCES polls(poll_id) ON DELETE CASCADE,
+            FOREIGN KEY (voter_id) REFERENCES users(user_id) ON DELETE SET NULL,
+            UNIQUE(voter_id, poll_id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ranked_ballots_poll ON ranked_ballots(poll_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ranked_ballots_cast_at ON ranked_ballots(cast_at, poll_id)")
+    
+    # Create full-text search index over questions and option texts
+    global SEARCH_AVAILABLE
+    SEARCH_AVAILABLE = search.create_search_index(cursor)
+    if not SEARCH_AVAILABLE:
+        print("Warning: SQLite FTS5 not available. Poll search will be disabled.")
+    
     conn.commit()
     conn.close()
     print("Database initialized successfully!")
@@ -86,6 +194,22 @@ def init_database():
 # Initialize database on startup
 init_database()
 
+# Reads go through a pool of read-only connections; all writes are
+# serialised onto a single writer thread and connection.
+reader_pool = ReaderPool(DB_PATH, size=READER_POOL_SIZE)
+writer = Writer(DB_PATH)
+
+token_manager = tokens.TokenManager(SECRET_KEY, ttl=TOKEN_TTL)
+
+# Trending scores live in memory and are rebuilt from recent votes and ballots
+trending_index = trending.TrendingIndex(half_life=TRENDING_HALF_LIFE)
+with reader_pool.connection() as conn:
+    trending.rebuild(trending_index, conn)
+
+# (poll_id, newest ballot_id) -> ranked results payload, least recently used first
+ranked_results_cache = OrderedDict()
+ranked_results_lock = threading.Lock()
+
 def generate_poll_link():
     """Generate unique poll link"""
     return secrets.token_urlsafe(10)[:20]
@@ -96,9 +220,57 @@ def row_to_dict(row):
         return None
     return dict(row)
 
+def get_bearer_token():
+    """Return the token from an 'Authorization: Bearer <token>' header, if any"""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return None
+
+def authenticated_voter(data):
+    """Work out the voter from the session token.
+
+    Returns (voter_id, error_response). Without a token the vote is
+    anonymous; a voter_id in the body is only accepted if it matches the
+    token, so clients can no longer vote as someone else.
+    """
+    token = get_bearer_token()
+    claimed_id = data.get('voter_id')
+    
+    if token is None:
+        if claimed_id:
+            return None, (jsonify({'error': 'Login required to vote as a user'}), 401)
+        return None, None
+    
+    voter_id = token_manager.verify(token)
+    if voter_id is None:
+        return None, (jsonify({'error': 'Invalid or expired session token'}), 401)
+    if claimed_id and claimed_id != voter_id:
+        return None, (jsonify({'error': 'voter_id does not match session token'}), 401)
+    return voter_id, None
+
+def admission_controlled(route_class):
+    """Decorator that rate-limits and load-sheds an endpoint"""
+    controller = ADMISSION[route_class]
+    
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with controller.admit(request.remote_addr or 'unknown'):
+                    return view(*args, **kwargs)
+            except Rejected as e:
+                response = jsonify({'error': e.reason})
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+        return wrapper
+    return decorator
+
 # ============= USER ENDPOINTS =============
 
 @app.route('/api/users/register', methods=['POST'])
+@admission_controlled('auth')
 def register_user():
     """Register a new user"""
     if not BCRYPT_AVAILABLE:
@@ -113,27 +285,29 @@ def register_user():
         if not username or not email or not password:
             return jsonify({'error': 'All fields are required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Check if email already exists
-        cursor.execute("SELECT user_id FROM users WHERE email = ?", (email,))
-        if cursor.fetchone():
-            conn.close()
-            return jsonify({'error': 'Email already registered'}), 400
+        with reader_pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT user_id FROM users WHERE email = ?", (email,))
+            if cursor.fetchone():
+                return jsonify({'error': 'Email already registered'}), 400
         
-        # Hash password
+        # Hash password (outside the writer thread - bcrypt is slow)
         password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
         
         # Insert user
-        cursor.execute(
-            "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
-            (username, email, password_hash)
-        )
-        conn.commit()
-        user_id = cursor.lastrowid
+        def insert_user(conn):
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+                (username, email, password_hash)
+            )
+            return cursor.lastrowid
         
-        conn.close()
+        try:
+            user_id = writer.run(insert_user)
+        except sqlite3.IntegrityError:
+            return jsonify({'error': 'Email already registered'}), 400
         
         return jsonify({
             'message': 'User registered successfully',
@@ -144,6 +318,7 @@ def register_user():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/users/login', methods=['POST'])
+@admission_controlled('auth')
 def login_user():
     """Login user"""
     if not BCRYPT_AVAILABLE:
@@ -157,17 +332,19 @@ def login_user():
         if not email or not password:
             return jsonify({'error': 'Email and password are required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-        row = cursor.fetchone()
-        conn.close()
+        with reader_pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
+            row = cursor.fetchone()
         
         if row:
             user = row_to_dict(row)
             if bcrypt.check_password_hash(user['password_hash'], password):
+                token, expires_at = token_manager.issue(user['user_id'])
                 return jsonify({
                     'message': 'Login successful',
+                    'token': token,
+                    'expires_at': expires_at,
                     'user': {
                         'user_id': user['user_id'],
                         'username': user['username'],
@@ -180,6 +357,15 @@ def login_user():
     except sqlite3.Error as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/users/logout', methods=['POST'])
+def logout_user():
+    """Revoke the session token sent in the Authorization header"""
+    token = get_bearer_token()
+    if not token or not token_manager.revoke(token):
+        return jsonify({'error': 'Invalid session token'}), 401
+    
+    return jsonify({'message': 'Logout successful'}), 200
+
 # ============= POLL ENDPOINTS =============
 
 @app.route('/api/polls', methods=['POST'])
@@ -190,6 +376,10 @@ def create_poll():
         question = data.get('question')
         options = data.get('options', [])
         creator_id = data.get('creator_id')  # Optional, can be None for anonymous
+        poll_type = data.get('poll_type', 'single')
+        
+        if poll_type not in POLL_TYPES:
+            return jsonify({'error': 'poll_type must be single or ranked'}), 400
         
         if not question:
             return jsonify({'error': 'Poll question is required'}), 400
@@ -202,35 +392,37 @@ def create_poll():
         if len(valid_options) < 2:
             return jsonify({'error': 'At least 2 valid options are required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        if poll_type == 'ranked' and len(valid_options) > ranked.MAX_OPTIONS:
+            return jsonify({'error': f'Ranked polls support at most {ranked.MAX_OPTIONS} options'}), 400
         
-        # Generate unique poll link
-        poll_link = generate_poll_link()
-        
-        # Check if poll_link already exists (very unlikely, but check anyway)
-        while True:
-            cursor.execute("SELECT poll_id FROM polls WHERE poll_link = ?", (poll_link,))
-            if not cursor.fetchone():
-                break
+        def insert_poll(conn):
+            cursor = conn.cursor()
+            
+            # Generate unique poll link
             poll_link = generate_poll_link()
-        
-        # Insert poll
-        cursor.execute(
-            "INSERT INTO polls (creator_id, question, poll_link) VALUES (?, ?, ?)",
-            (creator_id if creator_id else None, question, poll_link)
-        )
-        poll_id = cursor.lastrowid
-        
-        # Insert options
-        for option_text in valid_options:
+            
+            # Check if poll_link already exists (very unlikely, but check anyway)
+            while True:
+                cursor.execute("SELECT poll_id FROM polls WHERE poll_link = ?", (poll_link,))
+                if not cursor.fetchone():
+                    break
+                poll_link = generate_poll_link()
+            
+            # Insert poll
             cursor.execute(
+                "INSERT INTO polls (creator_id, question, poll_link, poll_type) VALUES (?, ?, ?, ?)",
+                (creator_id if creator_id else None, question, poll_link, poll_type)
+            )
+            poll_id = cursor.lastrowid
+            
+            # Insert options
+            cursor.executemany(
                 "INSERT INTO options (poll_id, option_text) VALUES (?, ?)",
-                (poll_id, option_text)
+                [(poll_id, option_text) for option_text in valid_options]
             )
+            return poll_id, poll_link
         
-        conn.commit()
-        conn.close()
+        poll_id, poll_link = writer.run(insert_poll)
         
         return jsonify({
             'message': 'Poll created successfully',
@@ -241,41 +433,96 @@ def create_poll():
     except sqlite3.Error as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/polls/search', methods=['GET'])
+def search_polls():
+    """Search polls by question and option text"""
+    if not SEARCH_AVAILABLE:
+        return jsonify({'error': 'Search not available. SQLite was built without FTS5.'}), 503
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Search query is required'}), 400
+    
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', SEARCH_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be integers'}), 400
+    
+    if page < 1 or per_page < 1:
+        return jsonify({'error': 'page and per_page must be positive'}), 400
+    per_page = min(per_page, SEARCH_MAX_PAGE_SIZE)
+    
+    try:
+        with reader_pool.connection() as conn:
+            polls, has_more, truncated = search.search_polls(conn, query, per_page, (page - 1) * per_page)
+        
+        return jsonify({
+            'polls': polls,
+            'page': page,
+            'per_page': per_page,
+            'has_more': has_more,
+            'truncated': truncated
+        }), 200
+        
+    except sqlite3.Error as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/polls/trending', methods=['GET'])
+def get_trending_polls():
+    """Get polls with the most recent voting activity (served from memory)"""
+    try:
+        limit = int(request.args.get('limit', TRENDING_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    limit = min(limit, TRENDING_MAX_LIMIT)
+    
+    polls = []
+    for poll_id, score, details in trending_index.top(limit):
+        poll = {'poll_id': poll_id, 'score': round(score, 4)}
+        poll.update(details or {})
+        polls.append(poll)
+    
+    return jsonify({
+        'polls': polls,
+        'half_life_seconds': TRENDING_HALF_LIFE
+    }), 200
+
 @app.route('/api/polls/<poll_link>', methods=['GET'])
 def get_poll(poll_link):
     """Get poll details with options"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get poll
-        cursor.execute("SELECT * FROM polls WHERE poll_link = ?", (poll_link,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
-            return jsonify({'error': 'Poll not found'}), 404
-        
-        poll = row_to_dict(row)
-        
-        # Get options
-        cursor.execute(
-            "SELECT option_id, option_text FROM options WHERE poll_id = ?",
-            (poll['poll_id'],)
-        )
-        option_rows = cursor.fetchall()
-        options = [row_to_dict(row) for row in option_rows]
-        
-        # Get vote counts for each option
-        for option in options:
+        with reader_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get poll
+            cursor.execute("SELECT * FROM polls WHERE poll_link = ?", (poll_link,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return jsonify({'error': 'Poll not found'}), 404
+            
+            poll = row_to_dict(row)
+            
+            # Get options
             cursor.execute(
-                "SELECT COUNT(*) as vote_count FROM votes WHERE option_id = ?",
-                (option['option_id'],)
+                "SELECT option_id, option_text FROM options WHERE poll_id = ?",
+                (poll['poll_id'],)
             )
-            vote_result = cursor.fetchone()
-            option['vote_count'] = vote_result[0] if vote_result else 0
-        
-        conn.close()
+            option_rows = cursor.fetchall()
+            options = [row_to_dict(row) for row in option_rows]
+            
+            # Get vote counts for each option
+            for option in options:
+                cursor.execute(
+                    "SELECT COUNT(*) as vote_count FROM votes WHERE option_id = ?",
+                    (option['option_id'],)
+                )
+                vote_result = cursor.fetchone()
+                option['vote_count'] = vote_result[0] if vote_result else 0
         
         # Convert datetime to ISO format string
         created_at = poll.get('created_at')
@@ -289,6 +536,7 @@ def get_poll(poll_link):
                 'poll_id': poll['poll_id'],
                 'question': poll['question'],
                 'poll_link': poll['poll_link'],
+                'poll_type': poll['poll_type'],
                 'created_at': created_at,
                 'options': options
             }
@@ -301,22 +549,20 @@ def get_poll(poll_link):
 def get_all_polls():
     """Get all polls (optional endpoint)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM polls ORDER BY created_at DESC")
-        poll_rows = cursor.fetchall()
-        polls = [row_to_dict(row) for row in poll_rows]
-        
-        # Get options for each poll
-        for poll in polls:
-            cursor.execute(
-                "SELECT option_id, option_text FROM options WHERE poll_id = ?",
-                (poll['poll_id'],)
-            )
-            option_rows = cursor.fetchall()
-            poll['options'] = [row_to_dict(row) for row in option_rows]
-        
-        conn.close()
+        with reader_pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM polls ORDER BY created_at DESC")
+            poll_rows = cursor.fetchall()
+            polls = [row_to_dict(row) for row in poll_rows]
+            
+            # Get options for each poll
+            for poll in polls:
+                cursor.execute(
+                    "SELECT option_id, option_text FROM options WHERE poll_id = ?",
+                    (poll['poll_id'],)
+                )
+                option_rows = cursor.fetchall()
+                poll['options'] = [row_to_dict(row) for row in option_rows]
         
         return jsonify({'polls': polls}), 200
         
@@ -325,55 +571,82 @@ def get_all_polls():
 
 # ============= VOTE ENDPOINTS =============
 
+def is_id(value):
+    """True for a positive integer ID (bool excluded)"""
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+def record_trending_vote(poll_id):
+    """Update trending scores; poll details are cached on the first vote"""
+    if not trending_index.has_poll(poll_id):
+        with reader_pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT question, poll_link FROM polls WHERE poll_id = ?", (poll_id,))
+            row = cursor.fetchone()
+        if row is None:
+            # Poll was deleted after the vote was written; nothing to rank
+            return
+        trending_index.add_poll(poll_id, row['question'], row['poll_link'])
+    trending_index.record_vote(poll_id)
+
 @app.route('/api/votes', methods=['POST'])
+@admission_controlled('vote')
 def submit_vote():
     """Submit a vote for a poll option"""
     try:
         data = request.get_json()
         poll_id = data.get('poll_id')
         option_id = data.get('option_id')
-        voter_id = data.get('voter_id')  # Optional, can be None for anonymous
         
         if not poll_id or not option_id:
             return jsonify({'error': 'Poll ID and option ID are required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Verify option belongs to poll
-        cursor.execute(
-            "SELECT poll_id FROM options WHERE option_id = ?",
-            (option_id,)
-        )
-        option = cursor.fetchone()
-        
-        if not option or option[0] != poll_id:
-            conn.close()
-            return jsonify({'error': 'Invalid option for this poll'}), 400
+        # None for anonymous votes
+        voter_id, error = authenticated_voter(data)
+        if error:
+            return error
         
-        # Check if user already voted (only if voter_id provided)
-        if voter_id:
+        def insert_vote(conn):
+            cursor = conn.cursor()
+            
+            # Verify option belongs to poll
             cursor.execute(
-                "SELECT vote_id FROM votes WHERE voter_id = ? AND poll_id = ?",
-                (voter_id, poll_id)
+                "SELECT o.poll_id, p.poll_type FROM options o JOIN polls p ON p.poll_id = o.poll_id "
+                "WHERE o.option_id = ?",
+                (option_id,)
             )
-            if cursor.fetchone():
-                conn.close()
-                return jsonify({'error': 'You have already voted on this poll'}), 400
-        
-        # Insert vote
-        try:
+            option = cursor.fetchone()
+            
+            if not option or option[0] != poll_id:
+                return None, 'Invalid option for this poll'
+            
+            if option[1] == 'ranked':
+                return None, 'This is a ranked-choice poll. Submit a ballot instead'
+            
+            # Check if user already voted (only if voter_id provided)
+            if voter_id:
+                cursor.execute(
+                    "SELECT vote_id FROM votes WHERE voter_id = ? AND poll_id = ?",
+                    (voter_id, poll_id)
+                )
+                if cursor.fetchone():
+                    return None, 'You have already voted on this poll'
+            
+            # Insert vote
             cursor.execute(
                 "INSERT INTO votes (poll_id, voter_id, option_id) VALUES (?, ?, ?)",
                 (poll_id, voter_id if voter_id else None, option_id)
             )
-            conn.commit()
-            vote_id = cursor.lastrowid
+            return cursor.lastrowid, None
+        
+        try:
+            vote_id, error = writer.run(insert_vote)
         except sqlite3.IntegrityError:
-            conn.close()
             return jsonify({'error': 'You have already voted on this poll'}), 400
         
-        conn.close()
+        if error:
+            return jsonify({'error': error}), 400
+        
+        record_trending_vote(poll_id)
         
         return jsonify({
             'message': 'Vote submitted successfully',
@@ -387,30 +660,35 @@ def submit_vote():
 def get_poll_results(poll_link):
     """Get poll results with vote counts"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get poll
-        cursor.execute("SELECT * FROM polls WHERE poll_link = ?", (poll_link,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
-            return jsonify({'error': 'Poll not found'}), 404
-        
-        poll = row_to_dict(row)
-        
-        # Get options with vote counts
-        cursor.execute("""
-            SELECT o.option_id, o.option_text, COUNT(v.vote_id) as vote_count
-            FROM options o
-            LEFT JOIN votes v ON o.option_id = v.option_id
-            WHERE o.poll_id = ?
-            GROUP BY o.option_id, o.option_text
-            ORDER BY o.option_id
-        """, (poll['poll_id'],))
-        option_rows = cursor.fetchall()
-        options = [row_to_dict(row) for row in option_rows]
+        with reader_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get poll
+            cursor.execute("SELECT * FROM polls WHERE poll_link = ?", (poll_link,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return jsonify({'error': 'Poll not found'}), 404
+            
+            poll = row_to_dict(row)
+            if poll['poll_type'] == 'ranked':
+                # Ranked ballots are not in votes; counting them needs the run-off
+                return jsonify({
+                    'error': 'This is a ranked-choice poll. Use the ranked-results endpoint.',
+                    'ranked_results': f"/api/polls/{poll_link}/ranked-results"
+                }), 400
+            
+            # Get options with vote counts
+            cursor.execute("""
+                SELECT o.option_id, o.option_text, COUNT(v.vote_id) as vote_count
+                FROM options o
+                LEFT JOIN votes v ON o.option_id = v.option_id
+                WHERE o.poll_id = ?
+                GROUP BY o.option_id, o.option_text
+                ORDER BY o.option_id
+            """, (poll['poll_id'],))
+            option_rows = cursor.fetchall()
+            options = [row_to_dict(row) for row in option_rows]
         
         # Calculate total votes
         total_votes = sum(option['vote_count'] for option in options)
@@ -422,8 +700,6 @@ def get_poll_results(poll_link):
                 2
             )
         
-        conn.close()
-        
         # Convert datetime to ISO format string
         created_at = poll.get('created_at')
         if created_at and isinstance(created_at, str):
@@ -436,6 +712,7 @@ def get_poll_results(poll_link):
                 'poll_id': poll['poll_id'],
                 'question': poll['question'],
                 'poll_link': poll['poll_link'],
+                'poll_type': poll['poll_type'],
                 'created_at': created_at,
                 'total_votes': total_votes,
                 'options': options
@@ -445,6 +722,222 @@ def get_poll_results(poll_link):
     except sqlite3.Error as e:
         return jsonify({'error': str(e)}), 500
 
+# ============= RANKED-CHOICE ENDPOINTS =============
+
+@app.route('/api/ballots', methods=['POST'])
+@admission_controlled('vote')
+def submit_ballot():
+    """Submit a ranked-choice ballot (option IDs in order of preference)"""
+    try:
+        data = request.get_json()
+        poll_id = data.get('poll_id')
+        ranking = data.get('ranking')
+        
+        if not poll_id or not isinstance(ranking, list) or not ranking:
+            return jsonify({'error': 'Poll ID and a non-empty ranking are required'}), 400
+        
+        # Require JSON integers; "1" would otherwise get its own trending entry
+        if not is_id(poll_id) or not all(is_id(option_id) for option_id in ranking):
+            return jsonify({'error': 'Poll ID and option IDs must be integers'}), 400
+        
+        # None for anonymous ballots
+        voter_id, error = authenticated_voter(data)
+        if error:
+            return error
+        
+        if len(set(ranking)) != len(ranking):
+            return jsonify({'error': 'Each option can only be ranked once'}), 400
+        
+        def insert_ballot(conn):
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT poll_type FROM polls WHERE poll_id = ?", (poll_id,))
+            poll = cursor.fetchone()
+            if not poll:
+                return None, 'Invalid poll'
+            if poll[0] != 'ranked':
+                return None, 'This poll does not accept ranked ballots'
+            
+            # Ballots store each option as its position in option_id order
+            cursor.execute("SELECT option_id FROM options WHERE poll_id = ? ORDER BY option_id", (poll_id,))
+            option_index = {row[0]: index for index, row in enumerate(cursor.fetchall())}
+            if any(option_id not in option_index for option_id in ranking):
+                return None, 'Invalid option for this poll'
+            
+            packed = ranked.pack_ranking([option_index[option_id] for option_id in ranking], len(option_index))
+            cursor.execute(
+                "INSERT INTO ranked_ballots (poll_id, voter_id, ranking) VALUES (?, ?, ?)",
+                (poll_id, voter_id if voter_id else None, packed)
+            )
+            return cursor.lastrowid, None
+        
+        try:
+            ballot_id, error = writer.run(insert_ballot)
+        except sqlite3.IntegrityError:
+            return jsonify({'error': 'You have already voted on this poll'}), 400
+        
+        if error:
+            return jsonify({'error': error}), 400
+        
+        record_trending_vote(poll_id)
+        
+        return jsonify({
+            'message': 'Ballot submitted successfully',
+            'ballot_id': ballot_id
+        }), 201
+        
+    except sqlite3.Error as e:
+        return jsonify({'error': str(e)}), 500
+
+def get_cached_ranked_results(key):
+    """Return the cached results payload for key, or None"""
+    with ranked_results_lock:
+        payload = ranked_results_cache.get(key)
+        if payload is not None:
+            ranked_results_cache.move_to_end(key)
+        return payload
+
+def cache_ranked_results(key, payload):
+    """Store a results payload, dropping older entries for the same poll"""
+    with ranked_results_lock:
+        for stale in [k for k in ranked_results_cache if k[0] == key[0]]:
+            del ranked_results_cache[stale]
+        ranked_results_cache[key] = payload
+        while len(ranked_results_cache) > RANKED_RESULTS_CACHE_SIZE:
+            ranked_results_cache.popitem(last=False)
+
+@app.route('/api/polls/<poll_link>/ranked-results', methods=['GET'])
+@admission_controlled('tally')
+def get_ranked_results(poll_link):
+    """Get instant-runoff results for a ranked-choice poll"""
+    if not ranked.NUMPY_AVAILABLE:
+        return jsonify({'error': 'Ranked results not available. numpy is not installed.'}), 503
+    
+    try:
+        with reader_pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get poll
+            cursor.execute("SELECT * FROM polls WHERE poll_link = ?", (poll_link,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return jsonify({'error': 'Poll not found'}), 404
+            
+            poll = row_to_dict(row)
+            if poll['poll_type'] != 'ranked':
+                return jsonify({'error': 'This is not a ranked-choice poll'}), 400
+            
+            # Ballots are never edited, so the newest ballot_id identifies the tally
+            cursor.execute(
+                "SELECT COALESCE(MAX(ballot_id), 0) FROM ranked_ballots WHERE poll_id = ?",
+                (poll['poll_id'],)
+            )
+            cache_key = (poll['poll_id'], cursor.fetchone()[0])
+            payload = get_cached_ranked_results(cache_key)
+            if payload is not None:
+                return jsonify({'poll': payload}), 200
+            
+            cursor.execute(
+                "SELECT option_id, option_text FROM options WHERE poll_id = ? ORDER BY option_id",
+                (poll['poll_id'],)
+            )
+            options = [row_to_dict(row) for row in cursor.fetchall()]
+            
+            ballots = ranked.fetch_ballots(conn, poll['poll_id'], len(options), cache_key[1])
+        
+        rounds, winner = ranked.instant_runoff(ballots, len(options))
+        
+        payload = {
+            'poll_id': poll['poll_id'],
+            'question': poll['question'],
+            'poll_link': poll['poll_link'],
+            'poll_type': poll['poll_type'],
+            'total_ballots': int(ballots.shape[0]),
+            'options': options,
+            'rounds': [
+                {
+                    'round': number,
+                    'counts': {
+                        str(options[index]['option_id']): count
+                        for index, count in enumerate(round_info['counts'])
+                        if count is not None
+                    },
+                    'exhausted': round_info['exhausted'],
+                    'eliminated': (options[round_info['eliminated']]['option_id']
+                                   if round_info['eliminated'] is not None else None)
+                }
+                for number, round_info in enumerate(rounds, start=1)
+            ],
+            'winner': options[winner] if winner is not None else None
+        }
+        cache_ranked_results(cache_key, payload)
+        
+        return jsonify({'poll': payload}), 200
+        
+    except sqlite3.Error as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============= ADMIN ENDPOINTS =============
+
+def check_admin_token():
+    """Return an error response if the request lacks a valid admin token"""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints not available. ADMIN_TOKEN is not set.'}), 503
+    token = request.headers.get('X-Admin-Token', '')
+    if not secrets.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({'error': 'Invalid admin token'}), 401
+    return None
+
+@app.route('/api/admin/backup', methods=['POST'])
+def create_backup():
+    """Take an online backup of the database and verify it"""
+    error = check_admin_token()
+    if error:
+        return error
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        compress = bool(data.get('compress', False))
+        pages = int(data.get('pages', backup.DEFAULT_PAGES))
+        sleep = float(data.get('sleep', backup.DEFAULT_SLEEP))
+        
+        # The backup runs on this request's thread, so bound how long it can take
+        if not backup.MIN_PAGES <= pages <= backup.MAX_PAGES or not 0 <= sleep <= backup.MAX_SLEEP:
+            return jsonify({
+                'error': f'pages must be between {backup.MIN_PAGES} and {backup.MAX_PAGES}, '
+                         f'sleep between 0 and {backup.MAX_SLEEP}'
+            }), 400
+        
+        # Destination is always chosen by the server, never by the client
+        dest = backup.default_backup_path(compress)
+        stats = backup.backup_database(dest, source_path=DB_PATH, pages=pages,
+                                       sleep=sleep, compress=compress)
+        ok, messages = backup.verify_backup(dest)
+        stats['integrity_ok'] = ok
+        stats['integrity_messages'] = messages
+        
+        return jsonify({
+            'message': 'Backup created successfully' if ok else 'Backup failed integrity check',
+            'backup': stats
+        }), 201 if ok else 500
+        
+    except (TypeError, ValueError):
+        return jsonify({'error': 'pages and sleep must be numbers'}), 400
+    except (sqlite3.Error, OSError) as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/admission', methods=['GET'])
+def get_admission_stats():
+    """Get admitted/shed counters for each admission-controlled route class"""
+    error = check_admin_token()
+    if error:
+        return error
+    
+    return jsonify({
+        'admission': {name: controller.stats() for name, controller in ADMISSION.items()}
+    }), 200
+
 if __name__ == '__main__':
     print("=" * 50)
     print("Quick Poll App - Backend Server")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Online backup for the Quick Poll SQLite database
+Run: python backup.py [destination] [--compress] [--pages N] [--sleep S]
+"""
+import argparse
+import gzip
+import os
+import secrets
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DB_PATH = os.getenv('SQLITE_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quick_poll_db.sqlite'))
+BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
+
+# Copy this many pages per step, pausing SLEEP seconds between steps. In WAL
+# mode the whole copy runs inside one read transaction on the source, so it
+# sees a fixed snapshot: writers keep committing to the WAL and the copy is
+# never restarted. Other journal modes fall back to plain stepping, where a
+# write restarts the copy; give up after MAX_RESTARTS rather than loop forever.
+DEFAULT_PAGES = 256
+DEFAULT_SLEEP = 0.005
+MAX_RESTARTS = 10
+# Bounds for client-supplied settings (the admin endpoint backs up on the
+# request thread): at least MIN_PAGES per step and at most MAX_SLEEP between
+# steps keep a 1 GB database to a few minutes.
+MIN_PAGES = 64
+MAX_PAGES = 65536
+MAX_SLEEP = 0.05
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def default_backup_path(compress=False):
+    """Build a unique, timestamped backup file path inside BACKUP_DIR"""
+    # Microseconds plus a random suffix so backups started together never
+    # replace each other
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    name = f"quick_poll_db_{stamp}_{secrets.token_hex(2)}.sqlite"
+    if compress:
+        name += '.gz'
+    return os.path.join(BACKUP_DIR, name)
+
+
+def backup_database(dest_path, source_path=DB_PATH, pages=DEFAULT_PAGES,
+                    sleep=DEFAULT_SLEEP, compress=False, progress=None):
+    """Copy the live database to dest_path without stopping writers.
+
+    Uses sqlite3.Connection.backup in batches of `pages` pages with a short
+    sleep between batches. On a WAL database the source is held in a single
+    read transaction for the whole copy, so concurrent writes neither block
+    nor restart it. Otherwise sqlite3.OperationalError is raised if writes
+    restart the copy more than MAX_RESTARTS times. When `compress` is true
+    the finished copy is gzipped into a second temporary file, and the
+    uncompressed copy is removed once that is done. `progress(copied, total)` is
+    called after each batch. Returns a dict with size and throughput statistics.
+    """
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    os.makedirs(dest_dir, exist_ok=True)
+
+    # Back up (and compress) into temporary files first so a failed run never
+    # leaves a half-written file at the destination.
+    fd, tmp_path = tempfile.mkstemp(suffix='.sqlite', dir=dest_dir)
+    os.close(fd)
+    gz_path = None
+
+    restarts = 0
+    last_remaining = None
+
+    def _progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        # remaining only grows when SQLite restarted the copy from page 1
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise sqlite3.OperationalError(
+                    f"Backup restarted {restarts} times by concurrent writes; giving up")
+        last_remaining = remaining
+        if progress:
+            progress(total - remaining, total)
+
+    started = time.perf_counter()
+    try:
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(tmp_path)
+        try:
+            journal_mode = source.execute("PRAGMA journal_mode").fetchone()[0]
+            if journal_mode == 'wal':
+                # Pin a snapshot for the whole copy
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target, pages=pages, progress=_progress, sleep=sleep)
+            page_size = target.execute("PRAGMA page_size").fetchone()[0]
+            page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+            source.close()
+
+        if compress:
+            fd, gz_path = tempfile.mkstemp(suffix='.gz', dir=dest_dir)
+            with open(tmp_path, 'rb') as src, os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb') as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            os.remove(tmp_path)
+            os.replace(gz_path, dest_path)
+        else:
+            os.replace(tmp_path, dest_path)
+    except BaseException:
+        for path in (tmp_path, gz_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+        raise
+
+    elapsed = time.perf_counter() - started
+    db_bytes = page_size * page_count
+    return {
+        'path': dest_path,
+        'compressed': compress,
+        'pages': page_count,
+        'database_bytes': db_bytes,
+        'file_bytes': os.path.getsize(dest_path),
+        'restarts': restarts,
+        'seconds': round(elapsed, 3),
+        'mb_per_second': round(db_bytes / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def verify_backup(backup_path):
+    """Restore a backup to a scratch file and run PRAGMA integrity_check.
+
+    Returns (ok, messages) where messages is the list of rows reported by
+    SQLite ('ok' on a healthy database), or the error that stopped the
+    file from being restored or opened.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    try:
+        if backup_path.endswith('.gz'):
+            with gzip.open(backup_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+        else:
+            shutil.copyfile(backup_path, tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            messages = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        finally:
+            conn.close()
+    except (sqlite3.DatabaseError, EOFError, OSError) as e:
+        # A truncated or corrupt .gz raises EOFError or gzip.BadGzipFile (an OSError)
+        messages = [f"{type(e).__name__}: {e}"]
+    finally:
+        os.remove(tmp_path)
+
+    return messages == ['ok'], messages
+
+
+def print_progress(copied, total):
+    """Progress callback that prints a single updating line"""
+    percentage = (copied / total * 100) if total else 100
+    print(f"\r  {copied}/{total} pages ({percentage:5.1f}%)", end='', flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Online backup of the Quick Poll database')
+    parser.add_argument('destination', nargs='?', help='Backup file path (default: backups/<timestamp>.sqlite)')
+    parser.add_argument('--compress', action='store_true', help='gzip the backup file')
+    parser.add_argument('--pages', type=int, default=DEFAULT_PAGES, help='Pages copied per step')
+    parser.add_argument('--sleep', type=float, default=DEFAULT_SLEEP, help='Seconds to pause between steps')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the integrity check')
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f"Database not found at: {DB_PATH}")
+        return 1
+
+    dest = args.destination or default_backup_path(args.compress)
+
+    try:
+        print(f"Backing up {DB_PATH}")
+        stats = backup_database(dest, pages=args.pages, sleep=args.sleep,
+                                compress=args.compress, progress=print_progress)
+        print()
+        print(f"Backup written to: {stats['path']}")
+        print(f"  {stats['database_bytes']} bytes in {stats['seconds']}s ({stats['mb_per_second']} MB/s)")
+        if stats['compressed']:
+            print(f"  Compressed size: {stats['file_bytes']} bytes")
+
+        if not args.no_verify:
+            ok, messages = verify_backup(dest)
+            if not ok:
+                print("Integrity check FAILED:")
+                for message in messages:
+                    print(f"  {message}")
+                return 1
+            print("Integrity check passed")
+        return 0
+
+    except sqlite3.Error as e:
+        print(f"\nDatabase error: {str(e)}")
+        return 1
+    except OSError as e:
+        print(f"\nError: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: instant-runoff tally over a large number of ranked ballots
+Run: python benchmarks/bench_ranked.py [--ballots 1000000] [--options 20]
+
+Generates ballots with partial rankings and skewed preferences so the count
+goes through many rounds, stores them the way app.py does (packed blobs in
+ranked_ballots), then times loading from SQLite and the vectorized tally
+separately. Loading compares ranked.fetch_ballots (one group_concat blob)
+with fetching one row per ballot. A per-ballot Python loop on a sample is
+included for reference.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import ranked  # noqa: E402
+
+
+def generate_ballots(n_ballots, n_options, seed=0):
+    """Random partial rankings, padded with ranked.UNRANKED"""
+    rng = np.random.default_rng(seed)
+    # Options with a higher bias tend to be ranked earlier
+    bias = np.linspace(0, 1.5, n_options)
+    order = np.argsort(rng.random((n_ballots, n_options)) - bias, axis=1).astype(np.uint8)
+    lengths = rng.integers(1, n_options + 1, size=n_ballots)
+    order[np.arange(n_options) >= lengths[:, None]] = ranked.UNRANKED
+    return order
+
+
+def python_instant_runoff(ballots, n_options):
+    """Straightforward per-ballot loop, for comparison"""
+    active = set(range(n_options))
+    while True:
+        counts = dict.fromkeys(active, 0)
+        continuing = 0
+        for ballot in ballots:
+            for choice in ballot:
+                if choice in active:
+                    counts[choice] += 1
+                    continuing += 1
+                    break
+        leader = max(counts, key=counts.get)
+        if counts[leader] * 2 > continuing or len(active) == 1:
+            return leader
+        active.remove(min(counts, key=counts.get))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vectorized instant-runoff benchmark')
+    parser.add_argument('--ballots', type=int, default=1000000, help='Number of ballots')
+    parser.add_argument('--options', type=int, default=20, help='Options per poll')
+    parser.add_argument('--repeat', type=int, default=5, help='Tally repetitions')
+    parser.add_argument('--python-sample', type=int, default=50000,
+                        help='Ballots for the pure-Python reference (0 to skip)')
+    args = parser.parse_args()
+
+    matrix = generate_ballots(args.ballots, args.options)
+    blobs = [row.tobytes() for row in matrix]
+    print(f"{args.ballots} ballots x {args.options} options "
+          f"({len(blobs[0])} bytes per ballot)\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'ranked_bench.sqlite'))
+        conn.execute("CREATE TABLE ranked_ballots (ballot_id INTEGER PRIMARY KEY, poll_id INTEGER, ranking BLOB)")
+        conn.execute("CREATE INDEX idx_ranked_ballots_poll ON ranked_ballots(poll_id)")
+        conn.executemany("INSERT INTO ranked_ballots (poll_id, ranking) VALUES (1, ?)", ((b,) for b in blobs))
+        conn.commit()
+
+        started = time.perf_counter()
+        cursor = conn.execute("SELECT ranking FROM ranked_ballots WHERE poll_id = 1")
+        per_row = ranked.load_ballots(b''.join(row[0] for row in cursor), args.options)
+        per_row_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        max_ballot_id = conn.execute("SELECT MAX(ballot_id) FROM ranked_ballots WHERE poll_id = 1").fetchone()[0]
+        loaded = ranked.fetch_ballots(conn, 1, args.options, max_ballot_id)
+        load_seconds = time.perf_counter() - started
+        conn.close()
+    assert loaded.shape == per_row.shape == matrix.shape
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        rounds, winner = ranked.instant_runoff(loaded, args.options)
+        timings.append(time.perf_counter() - started)
+
+    print(f"Load, group_concat:    {load_seconds * 1000:8.1f} ms")
+    print(f"Load, row per ballot:  {per_row_seconds * 1000:8.1f} ms")
+    print(f"Vectorized tally:      {min(timings) * 1000:8.1f} ms best, "
+          f"{sorted(timings)[len(timings) // 2] * 1000:.1f} ms median "
+          f"({len(rounds)} rounds, winner option index {winner})")
+
+    if args.python_sample:
+        sample = [list(row) for row in matrix[:args.python_sample]]
+        started = time.perf_counter()
+        python_instant_runoff(sample, args.options)
+        elapsed = time.perf_counter() - started
+        print(f"Python loop, {args.python_sample} ballots: {elapsed * 1000:8.1f} ms "
+              f"(~{elapsed * args.ballots / args.python_sample:.1f} s extrapolated)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: poll-results read latency while vote write load climbs
+Run: python benchmarks/bench_read_write.py [--seconds 2] [--readers 4]
+
+Compares the reader pool + single writer thread used by app.py against the
+old approach of opening a fresh read-write connection per request.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from db import ReaderPool, Writer, connect_readwrite  # noqa: E402
+
+RESULTS_SQL = """
+    SELECT o.option_id, o.option_text, COUNT(v.vote_id) as vote_count
+    FROM options o
+    LEFT JOIN votes v ON o.option_id = v.option_id
+    WHERE o.poll_id = ?
+    GROUP BY o.option_id, o.option_text
+    ORDER BY o.option_id
+"""
+VOTE_SQL = "INSERT INTO votes (poll_id, voter_id, option_id) VALUES (?, NULL, ?)"
+
+POLLS = 200
+OPTIONS_PER_POLL = 4
+SEED_VOTES = 20000
+
+
+def create_database(path):
+    """Create the app schema and seed it with polls and votes"""
+    conn = connect_readwrite(path)
+    conn.executescript("""
+        CREATE TABLE polls (poll_id INTEGER PRIMARY KEY AUTOINCREMENT, question TEXT NOT NULL);
+        CREATE TABLE options (option_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                              poll_id INTEGER NOT NULL, option_text TEXT NOT NULL);
+        CREATE TABLE votes (vote_id INTEGER PRIMARY KEY AUTOINCREMENT, poll_id INTEGER NOT NULL,
+                            voter_id INTEGER, option_id INTEGER NOT NULL,
+                            voted_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        -- Same index app.py creates in init_database
+        CREATE INDEX idx_votes_option ON votes(option_id);
+    """)
+    conn.executemany("INSERT INTO polls (question) VALUES (?)",
+                     [(f"Question {i}",) for i in range(POLLS)])
+    conn.executemany("INSERT INTO options (poll_id, option_text) VALUES (?, ?)",
+                     [(p, f"Option {o}") for p in range(1, POLLS + 1) for o in range(OPTIONS_PER_POLL)])
+    conn.executemany(VOTE_SQL, [random_vote() for _ in range(SEED_VOTES)])
+    conn.commit()
+    conn.close()
+
+
+def random_vote():
+    poll_id = random.randint(1, POLLS)
+    option_id = (poll_id - 1) * OPTIONS_PER_POLL + random.randint(1, OPTIONS_PER_POLL)
+    return poll_id, option_id
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_level(path, mode, writers, readers, seconds):
+    """Run one load level and return (read latencies in ms, writes done)"""
+    stop = threading.Event()
+    latencies = []
+    lock = threading.Lock()
+    writes = [0]
+
+    if mode == 'split':
+        pool = ReaderPool(path, size=readers)
+        writer = Writer(path)
+
+        def read_once(poll_id):
+            with pool.connection() as conn:
+                conn.execute(RESULTS_SQL, (poll_id,)).fetchall()
+
+        def write_once(vote):
+            writer.run(lambda conn: conn.execute(VOTE_SQL, vote))
+    else:
+        def read_once(poll_id):
+            conn = sqlite3.connect(path, timeout=30)
+            conn.execute(RESULTS_SQL, (poll_id,)).fetchall()
+            conn.close()
+
+        def write_once(vote):
+            conn = sqlite3.connect(path, timeout=30)
+            conn.execute(VOTE_SQL, vote)
+            conn.commit()
+            conn.close()
+
+    def reader_loop():
+        local = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            read_once(random.randint(1, POLLS))
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    def writer_loop():
+        count = 0
+        while not stop.is_set():
+            write_once(random_vote())
+            count += 1
+        with lock:
+            writes[0] += count
+
+    threads = [threading.Thread(target=reader_loop) for _ in range(readers)]
+    threads += [threading.Thread(target=writer_loop) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    if mode == 'split':
+        writer.close()
+        pool.close()
+    return latencies, writes[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Read latency under increasing write load')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Duration of each load level')
+    parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads')
+    parser.add_argument('--levels', default='0,1,2,4,8', help='Comma-separated writer thread counts')
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(',')]
+
+    print(f"{'mode':<8} {'writers':>7} {'reads':>8} {'p50 ms':>8} {'p99 ms':>8} {'writes/s':>9}")
+    print("-" * 53)
+    for mode in ('split', 'shared'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.sqlite')
+            create_database(path)
+            if mode == 'shared':
+                # The old code path used SQLite's default rollback journal
+                conn = sqlite3.connect(path)
+                conn.execute("PRAGMA journal_mode=DELETE")
+                conn.close()
+            for writers in levels:
+                latencies, writes = run_level(path, mode, writers, args.readers, args.seconds)
+                print(f"{mode:<8} {writers:>7} {len(latencies):>8} "
+                      f"{statistics.median(latencies):>8.3f} {percentile(latencies, 99):>8.3f} "
+                      f"{writes / args.seconds:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
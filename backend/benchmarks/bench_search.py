@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FTS5 poll search latency on a large database
+Run: python benchmarks/bench_search.py [--polls 1000000] [--queries 200]
+
+Builds a temporary database with synthetic polls (three options each),
+indexes it with the same schema and triggers app.py uses, then compares
+search.search_polls against a LIKE '%term%' scan of polls.question.
+A share of the questions start with a common phrase, so some scenarios
+match a large fraction of the index the way "favorite" would in practice.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import search  # noqa: E402
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_QUESTION = 6
+OPTIONS_PER_POLL = 3
+BATCH_SIZE = 50000
+LIKE_QUERIES = 5  # LIKE scans are slow; a handful is enough
+COMMON_PHRASE = 'What is your favorite'
+COMMON_SHARE = 0.3
+
+
+def make_vocabulary(size):
+    rng = random.Random(42)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def make_question(rng, vocabulary):
+    words = ' '.join(rng.choices(vocabulary, k=WORDS_PER_QUESTION))
+    if rng.random() < COMMON_SHARE:
+        return f"{COMMON_PHRASE} {words}?"
+    return words + '?'
+
+
+def build_database(path, polls, vocabulary):
+    """Create the schema, insert polls and options, then build the index"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript("""
+        CREATE TABLE polls (poll_id INTEGER PRIMARY KEY AUTOINCREMENT, creator_id INTEGER,
+                            question VARCHAR(255) NOT NULL, poll_link VARCHAR(20) NOT NULL UNIQUE,
+                            created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE options (option_id INTEGER PRIMARY KEY AUTOINCREMENT, poll_id INTEGER NOT NULL,
+                              option_text VARCHAR(255) NOT NULL);
+    """)
+
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for start in range(1, polls + 1, BATCH_SIZE):
+        poll_ids = range(start, min(start + BATCH_SIZE, polls + 1))
+        conn.executemany(
+            "INSERT INTO polls (poll_id, question, poll_link) VALUES (?, ?, ?)",
+            [(pid, make_question(rng, vocabulary), f"p{pid}") for pid in poll_ids]
+        )
+        conn.executemany(
+            "INSERT INTO options (poll_id, option_text) VALUES (?, ?)",
+            [(pid, rng.choice(vocabulary)) for pid in poll_ids for _ in range(OPTIONS_PER_POLL)]
+        )
+    conn.commit()
+    print(f"Inserted {polls} polls in {time.perf_counter() - started:.1f}s")
+
+    # Existing rows go through the backfill path; new rows use the triggers
+    started = time.perf_counter()
+    search.create_search_index(conn.cursor())
+    conn.commit()
+    print(f"Built FTS5 index in {time.perf_counter() - started:.1f}s")
+    conn.close()
+
+
+def time_queries(func, terms):
+    latencies = []
+    for term in terms:
+        started = time.perf_counter()
+        func(term)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<28} {len(latencies):>7} {statistics.median(latencies):>10.3f} {p99:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FTS5 search latency at scale')
+    parser.add_argument('--polls', type=int, default=1000000, help='Number of polls to generate')
+    parser.add_argument('--queries', type=int, default=200, help='Search queries per scenario')
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary(VOCABULARY_SIZE)
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'search_bench.sqlite')
+        build_database(path, args.polls, vocabulary)
+
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+
+        single = [rng.choice(vocabulary) for _ in range(args.queries)]
+        double = [f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}" for _ in range(args.queries)]
+        prefix = [rng.choice(vocabulary)[:3] for _ in range(args.queries)]
+        letters = [rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(args.queries)]
+
+        def fts(term):
+            search.search_polls(conn, term, limit=20)
+
+        def like(term):
+            conn.execute(
+                "SELECT poll_id, question, poll_link, created_at FROM polls "
+                "WHERE question LIKE ? LIMIT 21", (f"%{term}%",)
+            ).fetchall()
+
+        print(f"\n{'scenario':<28} {'queries':>7} {'p50 ms':>10} {'p99 ms':>10}")
+        print("-" * 58)
+        report("fts5 one word", time_queries(fts, single))
+        report("fts5 two words", time_queries(fts, double))
+        report("fts5 3-letter prefix", time_queries(fts, prefix))
+        report("fts5 1 letter", time_queries(fts, letters))
+        # Terms from COMMON_PHRASE match COMMON_SHARE of all polls
+        report("fts5 common word", time_queries(fts, ['favorite'] * args.queries))
+        report("fts5 common prefix", time_queries(fts, ['fav'] * args.queries))
+        report("fts5 common 1 letter", time_queries(fts, ['w'] * args.queries))
+        # A missing word forces LIKE to scan the whole table
+        report("LIKE '%term%' (no match)", time_queries(like, ['zzzzzz'] * LIKE_QUERIES))
+
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-vote cost of authenticating the voter
+Run: python benchmarks/bench_tokens.py [--iterations 100000]
+
+Compares verifying a signed session token (cold and from the LRU) with
+the alternatives it replaces: looking the user up in SQLite on every vote,
+or re-checking the password with bcrypt (if installed).
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import tokens  # noqa: E402
+
+try:
+    import bcrypt
+    BCRYPT_AVAILABLE = True
+except ImportError:
+    BCRYPT_AVAILABLE = False
+
+USERS = 10000
+BCRYPT_ITERATIONS = 10
+
+
+def time_per_call(func, args_list):
+    started = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - started) / len(args_list) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Session token verification overhead')
+    parser.add_argument('--iterations', type=int, default=100000, help='Verifications per scenario')
+    args = parser.parse_args()
+    n = args.iterations
+
+    manager = tokens.TokenManager('benchmark-secret', cache_size=USERS)
+    user_tokens = [manager.issue(user_id)[0] for user_id in range(1, USERS + 1)]
+    sample = [(user_tokens[i % USERS],) for i in range(n)]
+
+    # Cold: a manager without a cache computes the HMAC every time
+    uncached = tokens.TokenManager('benchmark-secret', cache_size=0)
+    cold = time_per_call(uncached.verify, sample)
+
+    for token in user_tokens:
+        manager.verify(token)  # fill the cache
+    warm = time_per_call(manager.verify, sample)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'tokens_bench.sqlite'))
+        conn.execute("""CREATE TABLE users (user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username VARCHAR(50) NOT NULL, email VARCHAR(100) NOT NULL UNIQUE,
+                        password_hash VARCHAR(255) NOT NULL)""")
+        conn.executemany("INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+                         [(f"user{i}", f"user{i}@example.com", 'x' * 60) for i in range(USERS)])
+        conn.commit()
+
+        def lookup(user_id):
+            conn.execute("SELECT user_id FROM users WHERE user_id = ?", (user_id,)).fetchone()
+
+        db = time_per_call(lookup, [(i % USERS + 1,) for i in range(n)])
+        conn.close()
+
+    if BCRYPT_AVAILABLE:
+        password_hash = bcrypt.hashpw(b'password', bcrypt.gensalt())
+        password_check = time_per_call(bcrypt.checkpw, [(b'password', password_hash)] * BCRYPT_ITERATIONS)
+
+    print(f"{'scenario':<32} {'us per vote':>12}")
+    print("-" * 45)
+    print(f"{'token verify (HMAC)':<32} {cold:>12.2f}")
+    print(f"{'token verify (LRU hit)':<32} {warm:>12.2f}")
+    print(f"{'users table lookup':<32} {db:>12.2f}")
+    if BCRYPT_AVAILABLE:
+        print(f"{'bcrypt password check':<32} {password_check:>12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
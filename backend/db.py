@@ -0,0 +1,144 @@
+"""
+SQLite connection handling: a pool of read-only connections for the read
+endpoints and a single writer thread that owns the only read-write
+connection.
+"""
+import pathlib
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+# How long a caller waits for the database before giving up (seconds)
+BUSY_TIMEOUT = 5.0
+# How long a request waits for its write to run on the writer thread
+WRITE_TIMEOUT = 10.0
+
+
+def connect_readwrite(db_path, check_same_thread=True):
+    """Open a read-write connection with WAL enabled"""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers keep reading while the writer commits
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def connect_readonly(db_path):
+    """Open a read-only connection that may be handed between threads"""
+    # as_uri() percent-encodes '#', '?' and '%' so they stay part of the path
+    uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class ReaderPool:
+    """Fixed-size pool of read-only (mode=ro) connections"""
+
+    def __init__(self, db_path, size=4):
+        self.db_path = db_path
+        self.size = size
+        self._pool = queue.LifoQueue()
+        for _ in range(size):
+            self._pool.put(connect_readonly(db_path))
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block"""
+        try:
+            conn = self._pool.get(timeout=BUSY_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError('No read connection available') from None
+        try:
+            yield conn
+        finally:
+            # End any implicit read transaction so the WAL can be checkpointed
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+    def close(self):
+        """Close every pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class Writer:
+    """Runs every write on one dedicated thread and connection.
+
+    Callers pass a function taking the connection; it runs inside a
+    transaction on the writer thread. The result (or exception) is returned
+    to the caller. Serialising writes here means request threads never
+    compete with each other for SQLite's write lock.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Opened here so a bad path or a locked database fails at startup
+        # instead of silently killing the writer thread
+        self._conn = connect_readwrite(db_path, check_same_thread=False)
+        self._tasks = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        conn = self._conn
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is self._STOP:
+                    break
+                func, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with conn:  # commit on success, rollback on error
+                        result = func(conn)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            conn.close()
+            self._fail_pending()
+
+    def _fail_pending(self):
+        """Fail every queued write once the writer thread has stopped"""
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            if task is not self._STOP and task[1].set_running_or_notify_cancel():
+                task[1].set_exception(sqlite3.OperationalError('Database writer is not running'))
+
+    def submit(self, func):
+        """Queue func(conn) on the writer thread and return a Future"""
+        future = Future()
+        self._tasks.put((func, future))
+        if not self._thread.is_alive():
+            self._fail_pending()
+        return future
+
+    def run(self, func, timeout=WRITE_TIMEOUT):
+        """Run func(conn) on the writer thread and wait for its result"""
+        future = self.submit(func)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Drop the write if it has not started yet
+            future.cancel()
+            raise sqlite3.OperationalError('Timed out waiting for the database writer') from None
+
+    def close(self):
+        """Finish queued writes and stop the writer thread"""
+        self._tasks.put(self._STOP)
+        self._thread.join()
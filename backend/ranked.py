@@ -0,0 +1,115 @@
+"""
+Ranked-choice ballots and instant-runoff tallying.
+
+A ballot is stored as a fixed-width blob with one byte per poll option:
+byte i is the index (in option_id order) of the voter's (i+1)-th choice,
+and unused positions are padded with UNRANKED. All ballots of a poll
+therefore load straight into an (n_ballots x n_options) uint8 matrix and
+every round is counted with NumPy instead of a per-ballot Python loop.
+"""
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+UNRANKED = 0xFF
+MAX_OPTIONS = UNRANKED  # option indexes 0..254 fit in one byte
+
+
+def pack_ranking(option_indexes, num_options):
+    """Pack a preference-ordered list of option indexes into a ballot blob"""
+    return bytes(option_indexes) + bytes([UNRANKED]) * (num_options - len(option_indexes))
+
+
+def unpack_ranking(blob):
+    """Inverse of pack_ranking"""
+    return [index for index in blob if index != UNRANKED]
+
+
+def load_ballots(data, num_options):
+    """Build the ballot matrix from packed ballots concatenated into one blob"""
+    return np.frombuffer(data or b'', dtype=np.uint8).reshape(-1, num_options)
+
+
+def fetch_ballots(conn, poll_id, num_options, max_ballot_id):
+    """Load a poll's ballots up to max_ballot_id as a matrix.
+
+    group_concat joins the blobs inside SQLite and returns a single value,
+    which avoids building one Python bytes object per ballot. Row order is
+    irrelevant to the tally.
+    """
+    row = conn.execute(
+        "SELECT CAST(group_concat(ranking, '') AS BLOB) FROM ranked_ballots "
+        "WHERE poll_id = ? AND ballot_id <= ?",
+        (poll_id, max_ballot_id)
+    ).fetchone()
+    return load_ballots(row[0], num_options)
+
+
+def instant_runoff(ballots, num_options):
+    """Run instant-runoff rounds over a ballot matrix.
+
+    Each ballot keeps a pointer to its highest-ranked continuing option.
+    When an option is eliminated only the ballots currently pointing at it
+    are advanced, so later rounds touch a small fraction of the matrix.
+
+    The lowest-count option is eliminated each round. Ties go against the
+    option with fewer first-round votes, then against the later option.
+
+    Returns (rounds, winner_index). Each round is a dict with the count per
+    option index (None once eliminated), the eliminated index and the
+    number of exhausted ballots. winner_index is None if there are no ballots.
+    """
+    n_ballots = ballots.shape[0]
+    if n_ballots == 0:
+        return [], None
+
+    # active[UNRANKED] stays False so padding is never a valid choice
+    active = np.zeros(256, dtype=bool)
+    active[:num_options] = True
+
+    exhausted_slot = num_options
+    rows = np.arange(n_ballots)
+    position = np.zeros(n_ballots, dtype=np.intp)
+    choice = ballots[:, 0].astype(np.intp)
+    choice[choice == UNRANKED] = exhausted_slot
+    counts = np.bincount(choice, minlength=num_options + 1)
+    first_round = counts[:num_options].copy()
+
+    rounds = []
+    remaining = num_options
+    while True:
+        continuing = n_ballots - counts[exhausted_slot]
+        standing = np.flatnonzero(active[:num_options])
+        round_info = {
+            'counts': [int(counts[i]) if active[i] else None for i in range(num_options)],
+            'exhausted': int(counts[exhausted_slot]),
+            'eliminated': None,
+        }
+        rounds.append(round_info)
+
+        leader = standing[np.argmax(counts[standing])]
+        if counts[leader] * 2 > continuing or remaining == 1:
+            return rounds, int(leader)
+
+        # Lowest count, then fewest first-round votes, then latest option
+        order = np.lexsort((-standing, first_round[standing], counts[standing]))
+        loser = int(standing[order[0]])
+        round_info['eliminated'] = loser
+        active[loser] = False
+        remaining -= 1
+
+        # Move every ballot sitting on the loser to its next continuing choice
+        moved = np.flatnonzero(choice == loser)
+        if moved.size:
+            sub = ballots[moved]
+            later = np.arange(num_options) > position[moved, None]
+            valid = active[sub] & later
+            has_next = valid.any(axis=1)
+            next_position = valid.argmax(axis=1)
+            new_choice = np.where(has_next, sub[rows[:moved.size], next_position], exhausted_slot)
+            position[moved] = next_position
+            choice[moved] = new_choice
+            counts[loser] = 0
+            counts += np.bincount(new_choice.astype(np.intp), minlength=num_options + 1)
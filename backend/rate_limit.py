@@ -0,0 +1,162 @@
+"""
+In-process admission control: per-client token buckets, a concurrency
+limit per route class, and load shedding when requests would queue longer
+than a latency target.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class Rejected(Exception):
+    """Raised when a request is shed; carries the HTTP status and Retry-After"""
+
+    def __init__(self, status, retry_after, reason):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets held in a bounded LRU.
+
+    Each client earns `rate` tokens per second up to `burst`. At most
+    `max_clients` buckets are kept; the least recently seen client is
+    evicted first, which simply resets it to a full bucket.
+    """
+
+    def __init__(self, rate, burst, max_clients=10000):
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate must be positive and burst at least 1')
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+
+    def acquire(self, key, now=None):
+        """Take one token for key. Returns 0 if allowed, else seconds to wait."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / self.rate
+
+    def refund(self, key):
+        """Give back a token taken by acquire() for a request that never ran"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + 1)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests and sheds those that would wait too long.
+
+    Up to `max_concurrent` requests run at once. Others wait, but no more
+    than `max_waiting` of them and for no longer than `latency_target`
+    seconds; anything beyond that is shed instead of being queued.
+    """
+
+    def __init__(self, max_concurrent, max_waiting, latency_target):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Take a slot. Returns False if the request should be shed."""
+        with self._cond:
+            if self.in_flight < self.max_concurrent:
+                self.in_flight += 1
+                return True
+            if self.waiting >= self.max_waiting:
+                return False
+
+            self.waiting += 1
+            try:
+                admitted = self._cond.wait_for(
+                    lambda: self.in_flight < self.max_concurrent,
+                    timeout=self.latency_target
+                )
+            finally:
+                self.waiting -= 1
+            if admitted:
+                self.in_flight += 1
+            return admitted
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+
+class AdmissionController:
+    """Token bucket + concurrency limit + counters for one route class"""
+
+    def __init__(self, name, rate, burst, max_concurrent, max_waiting,
+                 latency_target, max_clients=10000):
+        self.name = name
+        self.buckets = TokenBucketLimiter(rate, burst, max_clients)
+        self.concurrency = ConcurrencyLimiter(max_concurrent, max_waiting, latency_target)
+        self.admitted = 0
+        self.shed_rate_limited = 0
+        self.shed_overloaded = 0
+        self._lock = threading.Lock()
+
+    def _count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    @contextmanager
+    def admit(self, client_key):
+        """Hold an admission slot for the with-block or raise Rejected"""
+        wait = self.buckets.acquire(client_key)
+        if wait:
+            self._count('shed_rate_limited')
+            raise Rejected(429, math.ceil(wait), 'Too many requests')
+
+        if not self.concurrency.acquire():
+            # Shedding is the server's fault, so the client keeps its token
+            self.buckets.refund(client_key)
+            self._count('shed_overloaded')
+            # Tell clients to come back after roughly one latency target
+            raise Rejected(503, max(1, math.ceil(self.concurrency.latency_target)),
+                           'Server is busy, please retry')
+
+        self._count('admitted')
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    def stats(self):
+        """Counters and current load for monitoring"""
+        return {
+            'admitted': self.admitted,
+            'shed_rate_limited': self.shed_rate_limited,
+            'shed_overloaded': self.shed_overloaded,
+            'in_flight': self.concurrency.in_flight,
+            'waiting': self.concurrency.waiting,
+            'tracked_clients': len(self.buckets),
+        }
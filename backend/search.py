@@ -0,0 +1,146 @@
+"""
+Full-text poll search backed by an SQLite FTS5 index over poll questions
+and option texts. Triggers on polls/options keep the index in sync.
+"""
+import re
+import sqlite3
+
+# Question matches count for more than option matches (bm25 column weights)
+QUESTION_WEIGHT = 2.0
+OPTIONS_WEIGHT = 1.0
+
+MAX_TERMS = 10
+
+# Shorter last words are matched exactly; a one-letter prefix matches most
+# of the index. FTS5 keeps prefix indexes for 2 and 3 characters so short
+# prefixes do not have to merge every matching term's doclist.
+MIN_PREFIX_LENGTH = 2
+
+# bm25 has to score and sort every match before LIMIT applies, which is slow
+# for words found in a large share of polls. Only the newest SEARCH_CANDIDATES
+# matches (FTS5 walks rowids in order without sorting) are ranked, so results
+# for rare words are exact and very common words are ranked among recent polls.
+SEARCH_CANDIDATES = 2000
+
+SEARCH_SCHEMA = [
+    # Lets the option triggers find a poll's options without a table scan
+    "CREATE INDEX IF NOT EXISTS idx_options_poll ON options(poll_id)",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS polls_fts USING fts5("
+    "question, option_texts, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+
+    # rowid of polls_fts is the poll_id
+    """CREATE TRIGGER IF NOT EXISTS polls_fts_insert AFTER INSERT ON polls BEGIN
+        INSERT INTO polls_fts (rowid, question, option_texts) VALUES (NEW.poll_id, NEW.question, '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS polls_fts_update AFTER UPDATE OF question ON polls BEGIN
+        UPDATE polls_fts SET question = NEW.question WHERE rowid = NEW.poll_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS polls_fts_delete AFTER DELETE ON polls BEGIN
+        DELETE FROM polls_fts WHERE rowid = OLD.poll_id;
+    END""",
+
+    # Appending on insert avoids re-reading every option of the poll
+    """CREATE TRIGGER IF NOT EXISTS options_fts_insert AFTER INSERT ON options BEGIN
+        UPDATE polls_fts SET option_texts = option_texts || ' ' || NEW.option_text
+        WHERE rowid = NEW.poll_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS options_fts_update AFTER UPDATE ON options BEGIN
+        UPDATE polls_fts SET option_texts = COALESCE(
+            (SELECT group_concat(option_text, ' ') FROM options WHERE poll_id = OLD.poll_id), '')
+        WHERE rowid = OLD.poll_id;
+        UPDATE polls_fts SET option_texts = COALESCE(
+            (SELECT group_concat(option_text, ' ') FROM options WHERE poll_id = NEW.poll_id), '')
+        WHERE rowid = NEW.poll_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS options_fts_delete AFTER DELETE ON options BEGIN
+        UPDATE polls_fts SET option_texts = COALESCE(
+            (SELECT group_concat(option_text, ' ') FROM options WHERE poll_id = OLD.poll_id), '')
+        WHERE rowid = OLD.poll_id;
+    END""",
+]
+
+BACKFILL_SQL = """
+    INSERT INTO polls_fts (rowid, question, option_texts)
+    SELECT p.poll_id, p.question,
+           COALESCE((SELECT group_concat(o.option_text, ' ') FROM options o WHERE o.poll_id = p.poll_id), '')
+    FROM polls p
+"""
+
+SEARCH_SQL = f"""
+    SELECT p.poll_id, p.question, p.poll_link, p.created_at
+    FROM (
+        SELECT rowid, bm25(polls_fts, {QUESTION_WEIGHT}, {OPTIONS_WEIGHT}) AS score
+        FROM polls_fts
+        WHERE polls_fts MATCH ?
+        ORDER BY rowid DESC
+        LIMIT {SEARCH_CANDIDATES}
+    ) AS matches
+    JOIN polls p ON p.poll_id = matches.rowid
+    ORDER BY matches.score
+    LIMIT ? OFFSET ?
+"""
+
+# More matches than SEARCH_CANDIDATES means some polls were never ranked
+CANDIDATES_SQL = f"""
+    SELECT COUNT(*) FROM (
+        SELECT rowid FROM polls_fts WHERE polls_fts MATCH ? LIMIT {SEARCH_CANDIDATES + 1}
+    )
+"""
+
+
+def create_search_index(cursor):
+    """Create the FTS5 index and its triggers, backfilling existing polls.
+
+    Returns False if this SQLite build has no FTS5 support.
+    """
+    row = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'polls_fts'"
+    ).fetchone()
+    existed = row is not None
+    if existed and 'prefix' not in row[0]:
+        # Created before prefix indexes were added; rebuild it from scratch
+        cursor.execute("DROP TABLE polls_fts")
+        existed = False
+    try:
+        for statement in SEARCH_SCHEMA:
+            cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        if 'fts5' in str(e).lower():
+            return False
+        raise
+    if not existed:
+        cursor.execute(BACKFILL_SQL)
+    return True
+
+
+def build_match_query(text):
+    """Turn free text into a safe FTS5 query.
+
+    Each word is quoted so FTS5 operators in user input are treated as plain
+    text, and the last word is a prefix match (if it has at least
+    MIN_PREFIX_LENGTH characters) so partial input still finds results.
+    Returns None if the text contains no searchable words.
+    """
+    terms = re.findall(r'\w+', text)[:MAX_TERMS]
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search_polls(conn, text, limit, offset=0):
+    """Return (polls, has_more, truncated) for the best-ranked matches of text.
+
+    has_more is true if another page of ranked results exists; truncated is
+    true if more polls match than the SEARCH_CANDIDATES that were ranked.
+    """
+    query = build_match_query(text)
+    if query is None:
+        return [], False, False
+    # Fetch one extra row to know whether another page exists
+    rows = conn.execute(SEARCH_SQL, (query, limit + 1, offset)).fetchall()
+    matches = conn.execute(CANDIDATES_SQL, (query,)).fetchone()[0]
+    return [dict(row) for row in rows[:limit]], len(rows) > limit, matches > SEARCH_CANDIDATES
@@ -0,0 +1,103 @@
+"""
+Compact HMAC-signed session tokens.
+
+A token is base64url(payload) + "." + base64url(signature), where payload
+packs the user id, expiry time and a random token id into 20 bytes and
+signature is HMAC-SHA256 truncated to 16 bytes. Verifying a token needs no
+database lookup; recently verified tokens are kept in a small LRU so
+repeat requests skip the HMAC entirely.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import secrets
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+PAYLOAD_FORMAT = '>QI8s'  # user_id, expires_at, token_id
+PAYLOAD_SIZE = struct.calcsize(PAYLOAD_FORMAT)
+SIGNATURE_SIZE = 16
+
+
+def _encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class TokenManager:
+    """Issues, verifies and revokes session tokens"""
+
+    def __init__(self, secret, ttl=24 * 3600, cache_size=10000):
+        self.secret = secret.encode('utf-8') if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # token -> (user_id, expires_at, token_id)
+        self._revoked = {}           # token_id -> expires_at
+        self._lock = threading.Lock()
+
+    def _sign(self, payload):
+        return hmac.new(self.secret, payload, hashlib.sha256).digest()[:SIGNATURE_SIZE]
+
+    def issue(self, user_id, now=None):
+        """Return (token, expires_at) for user_id"""
+        now = time.time() if now is None else now
+        expires_at = int(now) + self.ttl
+        payload = struct.pack(PAYLOAD_FORMAT, user_id, expires_at, secrets.token_bytes(8))
+        return f"{_encode(payload)}.{_encode(self._sign(payload))}", expires_at
+
+    def _decode_token(self, token):
+        """Check the signature and return (user_id, expires_at, token_id) or None"""
+        try:
+            payload_text, signature_text = token.split('.')
+            payload = _decode(payload_text)
+            signature = _decode(signature_text)
+        except (ValueError, binascii.Error):
+            return None
+        if len(payload) != PAYLOAD_SIZE or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        return struct.unpack(PAYLOAD_FORMAT, payload)
+
+    def verify(self, token, now=None):
+        """Return the user id for a valid, unexpired, unrevoked token, else None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            claims = self._cache.get(token)
+            if claims is not None:
+                self._cache.move_to_end(token)
+
+        if claims is None:
+            claims = self._decode_token(token)
+            if claims is None:
+                return None
+            with self._lock:
+                self._cache[token] = claims
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        user_id, expires_at, token_id = claims
+        if expires_at <= now or token_id in self._revoked:
+            return None
+        return user_id
+
+    def revoke(self, token, now=None):
+        """Revoke a token until it would have expired anyway"""
+        now = time.time() if now is None else now
+        claims = self._decode_token(token)
+        if claims is None:
+            return False
+        user_id, expires_at, token_id = claims
+        with self._lock:
+            # Forget revocations of tokens that have since expired
+            for revoked_id, revoked_expiry in list(self._revoked.items()):
+                if revoked_expiry <= now:
+                    del self._revoked[revoked_id]
+            if expires_at > now:
+                self._revoked[token_id] = expires_at
+            self._cache.pop(token, None)
+        return True
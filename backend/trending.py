@@ -0,0 +1,129 @@
+"""
+In-memory trending index: per-poll vote scores with exponential time decay,
+kept in a heap so votes update in O(log n) and reads never touch the
+database.
+
+Scores are stored relative to a reference time t0: a vote at time t adds
+exp(rate * (t - t0)). Every score decays by the same factor, so decay never
+changes the ranking and nothing has to be rewritten as time passes. The
+current score is recovered by multiplying by exp(-rate * (now - t0)).
+"""
+import heapq
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+# Move t0 forward every this many half-lives; this keeps exp() far from
+# float overflow and is when polls that stopped trending are forgotten
+REBASE_HALF_LIVES = 20
+# Scores below this (at rebase time) are dropped to keep memory bounded
+MIN_SCORE = 1e-3
+
+
+class TrendingIndex:
+    """Top-K polls by exponentially decayed vote count"""
+
+    def __init__(self, half_life=3600.0, now=None):
+        self.half_life = half_life
+        self.rate = math.log(2) / half_life
+        self.t0 = time.time() if now is None else now
+        self._scores = {}   # poll_id -> score relative to t0
+        self._heap = []     # (-score, poll_id); entries go stale when a score changes
+        self._polls = {}    # poll_id -> {'question': ..., 'poll_link': ...}
+        self._lock = threading.Lock()
+
+    def add_poll(self, poll_id, question, poll_link):
+        """Remember the poll details returned by the trending endpoint.
+
+        Details are forgotten together with the poll's score at rebase time.
+        """
+        with self._lock:
+            self._polls[poll_id] = {'question': question, 'poll_link': poll_link}
+
+    def has_poll(self, poll_id):
+        return poll_id in self._polls
+
+    def record_vote(self, poll_id, at=None):
+        """Add one vote cast at time `at` (seconds since the epoch)"""
+        at = time.time() if at is None else at
+        with self._lock:
+            if at - self.t0 > REBASE_HALF_LIVES * self.half_life:
+                self._rebase(at)
+            score = self._scores.get(poll_id, 0.0) + math.exp(self.rate * (at - self.t0))
+            self._scores[poll_id] = score
+            heapq.heappush(self._heap, (-score, poll_id))
+            # Every vote leaves one stale heap entry behind; compact when they
+            # outnumber live ones so the heap stays O(n)
+            if len(self._heap) > 2 * len(self._scores) + 64:
+                self._compact()
+
+    def top(self, k, now=None):
+        """Return up to k (poll_id, score, details) tuples, highest score first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            decay = math.exp(-self.rate * (now - self.t0))
+            result = []
+            valid = []
+            while self._heap and len(result) < k:
+                neg_score, poll_id = heapq.heappop(self._heap)
+                if self._scores.get(poll_id) != -neg_score:
+                    continue  # stale entry, drop it for good
+                valid.append((neg_score, poll_id))
+                result.append((poll_id, -neg_score * decay, self._polls.get(poll_id)))
+            for entry in valid:
+                heapq.heappush(self._heap, entry)
+            return result
+
+    def _rebase(self, new_t0):
+        """Move t0 forward, rescale every score and drop negligible ones"""
+        factor = math.exp(-self.rate * (new_t0 - self.t0))
+        self._scores = {
+            poll_id: score * factor
+            for poll_id, score in self._scores.items()
+            if score * factor >= MIN_SCORE
+        }
+        self._polls = {poll_id: self._polls[poll_id] for poll_id in self._scores if poll_id in self._polls}
+        self.t0 = new_t0
+        self._compact()
+
+    def _compact(self):
+        self._heap = [(-score, poll_id) for poll_id, score in self._scores.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._scores)
+
+
+def parse_timestamp(value):
+    """Convert an SQLite CURRENT_TIMESTAMP string (UTC) to epoch seconds"""
+    parsed = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    return parsed.replace(tzinfo=timezone.utc).timestamp()
+
+
+def rebuild(index, conn, half_lives=10):
+    """Replay recent votes and ranked ballots into an empty index.
+
+    Only rows from the last `half_lives` half-lives are read; anything
+    older would contribute less than 0.1% to a score.
+    """
+    window = int(index.half_life * half_lives)
+    since = f"-{window} seconds"
+    cursor = conn.execute("""
+        SELECT v.poll_id, v.voted_at, p.question, p.poll_link
+        FROM votes v
+        JOIN polls p ON p.poll_id = v.poll_id
+        WHERE v.voted_at >= datetime('now', ?)
+        UNION ALL
+        SELECT b.poll_id, b.cast_at, p.question, p.poll_link
+        FROM ranked_ballots b
+        JOIN polls p ON p.poll_id = b.poll_id
+        WHERE b.cast_at >= datetime('now', ?)
+    """, (since, since))
+    count = 0
+    for poll_id, voted_at, question, poll_link in cursor:
+        if not index.has_poll(poll_id):
+            index.add_poll(poll_id, question, poll_link)
+        index.record_vote(poll_id, parse_timestamp(voted_at))
+        count += 1
+    return count
@@ -29,12 +29,11 @@ export const getPollResults = async (pollLink) => {
   return response.data;
 };
 
-// Vote API
-export const submitVote = async (pollId, optionId, voterId = null) => {
+// Vote API - the voter is taken from the session token, if logged in
+export const submitVote = async (pollId, optionId) => {
   const response = await api.post('/votes', {
     poll_id: pollId,
     option_id: optionId,
-    voter_id: voterId,
   });
   return response.data;
 };
@@ -54,6 +53,13 @@ export const loginUser = async (email, password) => {
     email,
     password,
   });
+  api.defaults.headers.common['Authorization'] = `Bearer ${response.data.token}`;
+  return response.data;
+};
+
+export const logoutUser = async () => {
+  const response = await api.post('/users/logout');
+  delete api.defaults.headers.common['Authorization'];
   return response.data;
 };
 